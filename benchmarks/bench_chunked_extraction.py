@@ -0,0 +1,90 @@
+"""Compares time and peak memory of in-memory and chunked extraction for large point sets.
+
+Writes synthetic daily subsets to a temporary directory and extracts random
+stations from them into a Parquet (or CSV) file: once by holding the whole
+(time, point) cube, as extract_precipitation does for small point sets, and
+once per memory ceiling with imerg.extract_precipitation_chunked, which
+spills point blocks to disk. Peak memory is the largest traced Python/numpy
+allocation while extracting.
+
+    python benchmarks/bench_chunked_extraction.py --points 200000 --days 365 --memory-mb 64 256
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import imerg
+from opendap_standin import synthetic_subset
+
+
+def in_memory_extract(paths, dates, df_coords, output_file, output_format, workers):
+    """Extracts the whole cube at once, then writes it."""
+    cube = imerg.extract_cube(paths, imerg.PointIndex(df_coords), workers)
+    with imerg.open_output_writer(output_format, df_coords, output_file) as writer:
+        writer.write(dates, cube)
+
+
+def run(name, extract, n_days, n_points):
+    tracemalloc.start()
+    start = time.perf_counter()
+    extract()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>16}: {n_points} points x {n_days} days in {elapsed:7.2f}s -> "
+          f"{n_points * n_days / elapsed:12,.0f} points x days/s, peak {peak / 1024 ** 2:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--memory-mb", type=float, nargs="+", default=[64, 256])
+    parser.add_argument("--format", choices=["parquet", "csv", "long_csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=imerg.EXTRACTION_WORKERS)
+    parser.add_argument("--skip-in-memory", action="store_true", help="Skip holding the whole cube")
+    args = parser.parse_args()
+
+    bbox = (95.0, -11.0, 141.0, 6.0)
+    window = imerg.bbox_to_window(bbox)
+    rng = np.random.default_rng(0)
+    points_csv = pd.DataFrame({
+        "Lon": rng.uniform(bbox[0], bbox[2], args.points),
+        "Lat": rng.uniform(bbox[1], bbox[3], args.points),
+    }).to_csv(index=False)
+    df_coords = imerg.load_points(io.StringIO(points_csv))
+
+    with tempfile.TemporaryDirectory() as nc_directory:
+        body = synthetic_subset(*window)
+        paths, dates = [], []
+        for i in range(args.days):
+            date = datetime(2024, 1, 1) + timedelta(days=i)
+            path = imerg.subset_save_path(nc_directory, date)
+            with open(path, "wb") as f:
+                f.write(body)
+            paths.append(path)
+            dates.append(date)
+
+        output_file = imerg.output_path(nc_directory, "IMERG_Extracted", args.format)
+        if not args.skip_in_memory:
+            run("in-memory", lambda: in_memory_extract(paths, dates, df_coords, output_file, args.format, args.workers),
+                args.days, args.points)
+        for memory_mb in args.memory_mb:
+            run(f"chunked {memory_mb:g} MB",
+                lambda: imerg.extract_precipitation_chunked(paths, dates, df_coords, output_file, args.format, memory_mb,
+                                                          spill_dir=nc_directory, workers=args.workers),
+                args.days, args.points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measures the cold-start time of the CLI and of importing the library, against the former eager imports.
+
+Every case runs in a fresh interpreter, as a cron job or batch script
+would: `import imerg`, `imerg_cli.py --help`, and importing every
+library app.py used to load at start-up. It also lists which heavy
+libraries `import imerg` pulled in (none is expected).
+
+    python benchmarks/bench_cold_start.py --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("pandas", "xarray", "geopandas", "shapely", "scipy", "openpyxl", "aiohttp", "requests", "tqdm",
+                 "streamlit", "matplotlib")
+EAGER_IMPORTS = "import pandas, xarray, geopandas, shapely, scipy.sparse, openpyxl, aiohttp, requests, tqdm, " \
+                "streamlit, matplotlib.pyplot"
+
+CASES = {
+    "import imerg": [sys.executable, "-c", "import imerg"],
+    "cli --help": [sys.executable, os.path.join(ROOT, "imerg_cli.py"), "--help"],
+    "eager imports": [sys.executable, "-c", EAGER_IMPORTS],
+}
+
+
+def time_command(command, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, command in CASES.items():
+        times = time_command(command, args.repeat)
+        print(f"{name:>14}: median {statistics.median(times) * 1000:7.0f} ms, min {min(times) * 1000:7.0f} ms")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", f"import sys, imerg; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()
+    print(f"heavy libraries loaded by import imerg: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compares files/second of the "thread" and "async" download engines.
+
+Runs both engines against a local stand-in OPeNDAP server with artificial
+per-request latency, so the numbers reflect concurrency rather than bandwidth.
+
+    python benchmarks/bench_download_engines.py --days 365 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import imerg
+from opendap_standin import StandinServer
+
+
+def run(engine, dates, bbox, server):
+    imerg.BASE_URL = server.base_url
+    with tempfile.TemporaryDirectory() as download_dir:
+        report = imerg.DownloadReport()
+        start = time.perf_counter()
+        results = imerg.download_all_imerg(dates, download_dir, "benchmark-token", bbox, report, engine=engine)
+        elapsed = time.perf_counter() - start
+    ok = sum(result is not None for result in results)
+    print(f"{engine:>6}: {ok}/{len(dates)} files in {elapsed:6.2f}s -> {ok / elapsed:7.1f} files/s "
+          f"(retries: {report.retries})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.2, help="Server latency per request (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    args = parser.parse_args()
+
+    dates = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(args.days)]
+    bbox = (106.0, -7.5, 108.5, -6.0)
+    imerg.HTTP_BACKOFF_BASE = 0.05
+    with StandinServer(latency=args.latency, fail_rate=args.fail_rate) as server:
+        for engine in imerg.DOWNLOAD_ENGINES:
+            run(engine, dates, bbox, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compares points x days/second of the per-row, vectorised and time-cube point extraction.
+
+Writes synthetic daily subsets to a temporary directory and extracts random
+stations from them: with the former `df.apply` + `.sel(method="nearest")`
+loop, with imerg.extract_day and a PointIndex file by file, and with
+imerg.extract_cube decoding the files on a process pool.
+
+    python benchmarks/bench_extraction.py --points 2000 --days 365 --workers 8
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import imerg
+from opendap_standin import synthetic_subset
+
+
+def per_row_extract_day(nc_path, df_coords):
+    """The extraction loop extract_precipitation used before PointIndex."""
+    ds = xr.open_dataset(nc_path)
+    if "time" in ds.dims:
+        ds = ds.isel(time=0)
+
+    def extract_precip(row):
+        try:
+            value = ds["precipitation"].sel(lat=row["Lat"], lon=row["Lon"], method="nearest").values.item()
+            return value if np.isfinite(value) else -9999
+        except:
+            return -9999
+
+    values = df_coords.apply(extract_precip, axis=1)
+    ds.close()
+    return values
+
+
+def run(name, extract_all, n_days, n_points):
+    start = time.perf_counter()
+    results = np.asarray(extract_all(), dtype=float)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>10}: {n_points} points x {n_days} days in {elapsed:7.2f}s -> "
+          f"{n_points * n_days / elapsed:12,.0f} points x days/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=imerg.EXTRACTION_WORKERS)
+    parser.add_argument("--skip-per-row", action="store_true", help="Skip the slow per-row baseline")
+    args = parser.parse_args()
+
+    bbox = (95.0, -11.0, 141.0, 6.0)
+    window = imerg.bbox_to_window(bbox)
+    rng = np.random.default_rng(0)
+    points_csv = pd.DataFrame({
+        "Lon": rng.uniform(bbox[0], bbox[2], args.points),
+        "Lat": rng.uniform(bbox[1], bbox[3], args.points),
+    }).to_csv(index=False)
+    df_coords = imerg.load_points(io.StringIO(points_csv))
+
+    with tempfile.TemporaryDirectory() as nc_directory:
+        body = synthetic_subset(*window)
+        paths = []
+        for i in range(args.days):
+            date = datetime(2024, 1, 1) + timedelta(days=i)
+            path = imerg.subset_save_path(nc_directory, date)
+            with open(path, "wb") as f:
+                f.write(body)
+            paths.append(path)
+
+        points = imerg.PointIndex(df_coords)
+        results = []
+        if not args.skip_per_row:
+            results.append(run("per-row", lambda: [per_row_extract_day(path, df_coords) for path in paths],
+                               args.days, args.points))
+        results.append(run("vectorised", lambda: [imerg.extract_day(path, points) for path in paths],
+                           args.days, args.points))
+        results.append(run("cube", lambda: imerg.extract_cube(paths, points, args.workers), args.days, args.points))
+
+    print(f"results identical: {all(np.array_equal(results[0], other) for other in results[1:])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Local stand-in for the GES DISC OPeNDAP server used by the benchmarks.
+
+Serves synthetic GPM_3IMERGDL.07 `.nc4` subsets for any
+`precipitation[0:0][lon0:lon1][lat0:lat1]` constraint, with optional
+artificial latency, a configurable rate of 503 responses and of transfers
+cut off half way, and HTTP Range support.
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+import random
+import http.server
+from datetime import date
+from urllib.parse import unquote
+
+import numpy as np
+import xarray as xr
+
+_SUBSET_PATTERN = re.compile(r"precipitation\[0:0\]\[(\d+):(\d+)\]\[(\d+):(\d+)\]")
+_DATE_PATTERN = re.compile(r"3IMERG\.(\d{4})(\d{2})(\d{2})-")
+
+
+def synthetic_subset(lon0, lon1, lat0, lat1, with_coords=True, day=0):
+    """Builds the netCDF4 bytes of a synthetic daily subset for an index window.
+
+    `day` (e.g. a date ordinal) shifts the values, so every date of a series differs.
+    """
+    lon_idx = np.arange(lon0, lon1 + 1)
+    lat_idx = np.arange(lat0, lat1 + 1)
+    grid_lon, grid_lat = np.meshgrid(lon_idx, lat_idx, indexing="ij")
+    values = ((grid_lon * 7 + grid_lat * 3 + day * 11) % 100).astype("float32")[np.newaxis]
+    coords = {}
+    if with_coords:
+        coords["time"] = [0]
+        coords["lon"] = -179.95 + 0.1 * lon_idx
+        coords["lat"] = -89.95 + 0.1 * lat_idx
+    ds = xr.Dataset({"precipitation": (("time", "lon", "lat"), values)}, coords=coords)
+    fd, path = tempfile.mkstemp(suffix=".nc4")
+    os.close(fd)
+    try:
+        ds.to_netcdf(path, engine="h5netcdf")
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients cancelling mid-transfer are expected; keep benchmark output clean
+        pass
+
+
+class StandinServer:
+    """Threaded HTTP server answering OPeNDAP subset requests with synthetic data."""
+    def __init__(self, latency=0.0, fail_rate=0.0, truncate_rate=0.0, ranges=True):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.truncate_rate = truncate_rate
+        self.ranges = ranges
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._server = _QuietServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/opendap/GPM_L3/GPM_3IMERGDL.07"
+
+    def _body(self, path):
+        match = _SUBSET_PATTERN.search(path)
+        if match is None:
+            return None
+        day = _DATE_PATTERN.search(path)
+        with self._lock:
+            if path not in self._cache:
+                self._cache[path] = synthetic_subset(*map(int, match.groups()), with_coords="lon[" in path,
+                                                     day=date(*map(int, day.groups())).toordinal() if day else 0)
+            return self._cache[path]
+
+    def _handler(self):
+        standin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with standin._lock:
+                    standin.requests += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if random.random() < standin.fail_rate:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = standin._body(unquote(self.path))
+                if body is None:
+                    self.send_response(400)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                total = len(body)
+                start = 0
+                range_header = self.headers.get("Range", "")
+                if standin.ranges and range_header.startswith("bytes="):
+                    start = int(range_header[len("bytes="):].partition("-")[0])
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+                else:
+                    self.send_response(200)
+                if standin.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Type", "application/x-netcdf")
+                self.send_header("Content-Length", str(total - start))
+                self.end_headers()
+                payload = body[start:]
+                if random.random() < standin.truncate_rate:
+                    # Drop the connection half way through the body
+                    payload = payload[:len(payload) // 2]
+                    self.close_connection = True
+                self.wfile.write(payload)
+                with standin._lock:
+                    standin.bytes_sent += len(payload)
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,171 @@
+"""Command-line interface to the IMERG downloader and extractor, without the Streamlit UI.
+
+Runs the same download → extract → package pipeline as the app, for cron
+and batch jobs. Only the libraries a command needs are imported.
+
+    python imerg_cli.py run 2024-01-01 2024-12-31 --shapefile area.zip --points points.csv --out job --zip
+    python imerg_cli.py download 2024-01-01 2024-01-31 --bbox 106 -7 108 -6 --out subsets
+    python imerg_cli.py extract subsets points.csv IMERG_Extracted.parquet --format parquet
+    python imerg_cli.py zip job IMERG_Extracted.zip
+    python imerg_cli.py worker
+"""
+import argparse
+import os
+import sys
+
+import imerg
+
+
+def read_area(args):
+    """Returns (bbox, geometry) from --bbox or --shapefile; geometry is None for a bbox."""
+    if args.bbox:
+        return list(args.bbox), None
+    path = args.shapefile
+    if path.endswith(".zip"):
+        with open(path, "rb") as f:
+            path = imerg.handle_shapefile_upload(f.read(), os.path.join(args.out, "shapefile"))
+    gdf = imerg.gpd.read_file(path).to_crs(epsg=4326)
+    return [float(value) for value in gdf.total_bounds], imerg.shapely.union_all(gdf.geometry.values)
+
+
+def print_progress(completed, total, message):
+    print(f"\r{message}", end="", file=sys.stderr, flush=True)
+
+
+def print_report(summary):
+    print(f"{summary['succeeded']} downloaded, {summary['failed']} failed, {summary['cache_hits']} cache hits",
+          file=sys.stderr)
+    for date, reason in summary["failed_dates"].items():
+        print(f"  {date}: {reason}", file=sys.stderr)
+
+
+def download(args):
+    bbox, _ = read_area(args)
+    dates = imerg.job_dates(args.start_date, args.end_date)
+    report = imerg.DownloadReport()
+    os.makedirs(args.out, exist_ok=True)
+    imerg.download_all_imerg(dates, args.out, args.token, bbox, report, engine=args.engine,
+                             manifest=imerg.JobManifest.for_job(dates, bbox, args.out))
+    print_report(report.summary())
+    return 1 if report.failed_dates() else 0
+
+
+def check_output(points, output_format, aggregations=()):
+    """Exits before any download if the outputs of `points` cannot be written in `output_format`."""
+    error = imerg.output_error(len(points), output_format, aggregations)
+    if error:
+        raise SystemExit(error)
+
+
+def extract(args):
+    check_output(imerg.pd.read_csv(args.points), args.format)
+    imerg.extract_precipitation(args.nc_directory, args.points, args.output, args.format, args.memory_mb)
+    print(args.output)
+    return 0
+
+
+def run(args):
+    """Downloads, extracts and optionally packages one job into the --out workspace, like a queued job."""
+    points = imerg.pd.read_csv(args.points)
+    check_output(points, args.format, args.aggregate)
+    workspace = imerg.JobWorkspace(args.out)
+    bbox, geometry = read_area(args)
+    if args.fetch_mode == "polygon" and geometry is None:
+        raise SystemExit("--fetch-mode polygon needs --shapefile")
+    windows = imerg.fetch_windows(args.fetch_mode, points, geometry, args.merge_cells)
+    params = {
+        "start_date": args.start_date, "end_date": args.end_date, "bbox": bbox,
+        "windows": [[int(index) for index in window] for window in windows] if windows else None,
+        "shapefile": None, "csv_file": args.points,
+        "engine": args.engine, "in_memory": args.in_memory, "persist": False,
+        "use_store": args.store, "zonal_mode": False, "aggregations": args.aggregate,
+        "rolling_days": args.rolling_days, "wet_threshold": args.wet_threshold,
+        "output_format": args.format, "memory_mb": args.memory_mb,
+    }
+    report = imerg.DownloadReport()
+    result = imerg.process_job(workspace, params, args.token, report, progress=print_progress)
+    print(file=sys.stderr)
+    print_report(result["summary"])
+    for path in result["outputs"]:
+        print(path)
+    if args.zip:
+        print(workspace.create_zip("IMERG_Extracted.zip"))
+    return 1 if result["failed_dates"] else 0
+
+
+def package(args):
+    print(imerg.create_download_zip(args.directory, args.zip_filename))
+    return 0
+
+
+def worker(args):
+    """Runs one job queue worker in the foreground, next to or instead of the app's own."""
+    imerg.run_job_worker(args.queue)
+    return 0
+
+
+def add_area_arguments(parser):
+    area = parser.add_mutually_exclusive_group(required=True)
+    area.add_argument("--bbox", type=float, nargs=4, metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"))
+    area.add_argument("--shapefile", help="Shapefile (.shp, or a ZIP holding one) of the area")
+
+
+def add_download_arguments(parser):
+    parser.add_argument("start_date", help="YYYY-MM-DD")
+    parser.add_argument("end_date", help="YYYY-MM-DD, inclusive")
+    add_area_arguments(parser)
+    parser.add_argument("--out", required=True, help="Directory the subsets (and outputs) are written to")
+    parser.add_argument("--engine", choices=imerg.DOWNLOAD_ENGINES, default=imerg.DEFAULT_DOWNLOAD_ENGINE)
+    parser.add_argument("--token", default=os.environ.get("EARTHDATA_TOKEN", imerg.DEFAULT_TOKEN),
+                        help="NASA Earthdata token (default: $EARTHDATA_TOKEN)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    download_parser = commands.add_parser("download", help="Download daily subsets")
+    add_download_arguments(download_parser)
+    download_parser.set_defaults(handler=download)
+
+    extract_parser = commands.add_parser("extract", help="Extract point series from downloaded subsets")
+    extract_parser.add_argument("nc_directory")
+    extract_parser.add_argument("points", help="CSV of points (Lon, Lat)")
+    extract_parser.add_argument("output")
+    extract_parser.add_argument("--format", choices=imerg.OUTPUT_FORMATS, default="excel")
+    extract_parser.add_argument("--memory-mb", type=int, default=imerg.EXTRACTION_MEMORY_MB)
+    extract_parser.set_defaults(handler=extract)
+
+    run_parser = commands.add_parser("run", help="Download, extract and package in one go")
+    add_download_arguments(run_parser)
+    run_parser.add_argument("--points", required=True, help="CSV of points (Lon, Lat)")
+    run_parser.add_argument("--fetch-mode", choices=imerg.FETCH_MODES, default="bbox")
+    run_parser.add_argument("--merge-cells", type=int, default=imerg.HYPERSLAB_MERGE_CELLS)
+    run_parser.add_argument("--format", choices=imerg.OUTPUT_FORMATS, default="excel")
+    run_parser.add_argument("--memory-mb", type=int, default=imerg.EXTRACTION_MEMORY_MB)
+    run_parser.add_argument("--aggregate", choices=imerg.AGGREGATIONS, nargs="+", default=[])
+    run_parser.add_argument("--rolling-days", type=int, default=imerg.ROLLING_WINDOW_DAYS)
+    run_parser.add_argument("--wet-threshold", type=float, default=imerg.WET_DAY_THRESHOLD)
+    run_parser.add_argument("--in-memory", action="store_true", help="Extract straight from the downloaded bytes")
+    run_parser.add_argument("--store", action="store_true", help="Consolidate into the time-cube store")
+    run_parser.add_argument("--zip", action="store_true", help="Also package the job into IMERG_Extracted.zip")
+    run_parser.set_defaults(handler=run)
+
+    zip_parser = commands.add_parser("zip", help="Package a directory into a ZIP archive")
+    zip_parser.add_argument("directory")
+    zip_parser.add_argument("zip_filename")
+    zip_parser.set_defaults(handler=package)
+
+    worker_parser = commands.add_parser("worker", help="Run a background job queue worker")
+    worker_parser.add_argument("--queue", default=imerg.JOB_QUEUE_FILE)
+    worker_parser.set_defaults(handler=worker)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
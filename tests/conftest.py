@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import imerg
+from opendap_standin import StandinServer
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Runs the test in an empty directory with a fresh subset cache and single-flight registry."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(imerg, "_subset_cache", None)
+    monkeypatch.setattr(imerg, "SUBSET_FLIGHTS", imerg.SingleFlight())
+    monkeypatch.setattr(imerg, "HTTP_BACKOFF_BASE", 0.01)
+    return tmp_path
+
+
+@pytest.fixture
+def standin(workdir, monkeypatch):
+    """Returns a function starting a stand-in OPeNDAP server that imerg downloads from."""
+    servers = []
+
+    def start(**options):
+        server = StandinServer(**options).__enter__()
+        servers.append(server)
+        monkeypatch.setattr(imerg, "BASE_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
@@ -0,0 +1,101 @@
+import json
+import os
+from datetime import datetime
+
+import imerg
+
+DATE = datetime(2024, 1, 1)
+
+
+def add_subset(cache, window, size=100, date=DATE):
+    path = os.path.join(cache.cache_dir, f"{date:%Y%m%d}_{'_'.join(map(str, window))}.nc4")
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    cache.add(date, window, path)
+    return path
+
+
+def journal_lines(cache):
+    with open(cache.index_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_lookup_serves_the_smallest_covering_entry(tmp_path):
+    cache = imerg.SubsetCache(str(tmp_path))
+    add_subset(cache, (0, 99, 0, 99))
+    small = add_subset(cache, (10, 19, 10, 19))
+
+    assert cache.lookup(DATE, (12, 15, 12, 15))["path"] == small
+    assert cache.lookup(DATE, (5, 15, 5, 15))["window"] == [0, 99, 0, 99]
+    assert cache.lookup(DATE, (90, 120, 0, 5)) is None
+    assert cache.lookup(datetime(2024, 1, 2), (12, 15, 12, 15)) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = imerg.SubsetCache(str(tmp_path), max_bytes=250)
+    first = add_subset(cache, (0, 9, 0, 9))
+    second = add_subset(cache, (10, 19, 0, 9))
+    cache.lookup(DATE, (0, 9, 0, 9))  # The first entry is now the most recently used
+    third = add_subset(cache, (20, 29, 0, 9))
+
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
+    assert cache.report()["evictions"] == 1
+    assert sorted(entry["path"] for entry in cache.entries.values()) == sorted([first, third])
+
+
+def test_adds_append_to_the_index_instead_of_rewriting_it(tmp_path):
+    cache = imerg.SubsetCache(str(tmp_path))
+    for i in range(10):
+        add_subset(cache, (i, i, 0, 0))
+    inode = os.stat(cache.index_path).st_ino
+    add_subset(cache, (10, 10, 0, 0))
+
+    assert os.stat(cache.index_path).st_ino == inode
+    assert len(journal_lines(cache)) == 11
+
+
+def test_journal_is_compacted_once_removals_pile_up(tmp_path):
+    cache = imerg.SubsetCache(str(tmp_path), max_bytes=100)
+    for i in range(200):
+        add_subset(cache, (i, i, 0, 0))
+
+    lines = journal_lines(cache)
+    assert len(lines) <= imerg.CACHE_INDEX_COMPACT_RATIO * len(cache.entries) + 64 + 2
+    assert len(imerg.SubsetCache(str(tmp_path)).entries) == 1
+
+
+def test_caches_sharing_a_directory_see_each_others_entries(tmp_path):
+    first = imerg.SubsetCache(str(tmp_path))
+    second = imerg.SubsetCache(str(tmp_path))
+    add_subset(first, (0, 9, 0, 9))
+    add_subset(second, (10, 19, 0, 9))
+
+    assert len(second.entries) == 2
+    add_subset(first, (20, 29, 0, 9))
+    assert len(first.entries) == 3
+    assert len(imerg.SubsetCache(str(tmp_path)).entries) == 3
+
+
+def test_torn_journal_line_is_skipped(tmp_path):
+    cache = imerg.SubsetCache(str(tmp_path))
+    add_subset(cache, (0, 9, 0, 9))
+    with open(cache.index_path, "a") as f:
+        f.write('{"key": "torn')
+    reopened = imerg.SubsetCache(str(tmp_path))
+    add_subset(reopened, (10, 19, 0, 9))
+
+    assert len(imerg.SubsetCache(str(tmp_path)).entries) == 2
+
+
+def test_legacy_json_index_is_migrated(tmp_path):
+    path = tmp_path / "subset.nc4"
+    path.write_bytes(b"\0" * 10)
+    entry = {"date": "20240101", "window": [0, 9, 0, 9], "path": str(path), "size": 10, "last_access": 0}
+    (tmp_path / imerg.CACHE_LEGACY_INDEX_FILE).write_text(json.dumps({"GPM|20240101|0:9|0:9": entry}))
+
+    cache = imerg.SubsetCache(str(tmp_path))
+
+    assert cache.entries == {"GPM|20240101|0:9|0:9": entry}
+    assert not (tmp_path / imerg.CACHE_LEGACY_INDEX_FILE).exists()
+    assert journal_lines(cache) == [{"key": "GPM|20240101|0:9|0:9", "entry": entry}]
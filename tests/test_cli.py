@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import zipfile
+
+import pandas as pd
+
+import imerg_cli
+from conftest import ROOT
+
+BBOX = ["106", "-7", "108", "-6"]
+
+
+def write_points(workdir):
+    points = workdir / "points.csv"
+    points.write_text("Lon,Lat\n106.5,-6.5\n107.5,-6.8\n")
+    return str(points)
+
+
+def test_import_leaves_heavy_libraries_unloaded():
+    heavy = ["pandas", "xarray", "geopandas", "shapely", "scipy", "openpyxl", "aiohttp", "requests", "streamlit"]
+    script = f"import sys, imerg_cli; print([name for name in {heavy!r} if name in sys.modules])"
+
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "[]"
+
+
+def test_download_extract_and_zip_commands(standin, workdir, capsys):
+    standin()
+    points = write_points(workdir)
+
+    assert imerg_cli.main(["download", "2024-01-01", "2024-01-04", "--bbox", *BBOX, "--out", "subsets",
+                           "--engine", "thread", "--token", "token"]) == 0
+    assert len([name for name in os.listdir("subsets") if name.endswith(".nc4")]) == 4
+    assert imerg_cli.main(["extract", "subsets", points, "out.csv", "--format", "csv"]) == 0
+    assert imerg_cli.main(["zip", "subsets", "subsets.zip"]) == 0
+
+    output, archive_path = capsys.readouterr().out.split()
+    assert output == "out.csv"
+    rows = pd.read_csv("out.csv", header=None)
+    assert rows[0].tolist()[-4:] == ["01-Jan-2024", "02-Jan-2024", "03-Jan-2024", "04-Jan-2024"]
+    with zipfile.ZipFile(archive_path) as archive:
+        assert len([name for name in archive.namelist() if name.endswith(".nc4")]) == 4
+
+
+def test_run_command_writes_outputs_and_zip(standin, workdir, capsys):
+    standin()
+    points = write_points(workdir)
+
+    status = imerg_cli.main(["run", "2024-01-01", "2024-01-03", "--bbox", *BBOX, "--points", points,
+                             "--out", "job", "--engine", "thread", "--token", "token", "--format", "parquet",
+                             "--aggregate", "monthly_total", "--zip"])
+
+    printed = capsys.readouterr()
+    assert status == 0
+    assert "3 downloaded, 0 failed" in printed.err
+    outputs = printed.out.split()
+    assert outputs[-1].endswith("IMERG_Extracted.zip")
+    assert any(path.endswith(".parquet") for path in outputs)
+    assert all(os.path.exists(path) for path in outputs)
+    series = pd.read_parquet(next(path for path in outputs if path.endswith(".parquet")))
+    assert len(series) == 3 * 2 and (series["value"] != -9999).all()
+    with zipfile.ZipFile(outputs[-1]) as archive:
+        assert {os.path.basename(path) for path in outputs[:-1]} <= set(archive.namelist())
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import imerg
+
+
+def controller(**options):
+    options.setdefault("global_cap", None)
+    return imerg.AdaptiveConcurrencyController(**options)
+
+
+def test_fast_responses_grow_the_limit_additively():
+    c = controller(initial=4, maximum=8)
+    for _ in range(4):
+        assert c.try_acquire()
+        c.release(latency=0.1, status=200)
+
+    assert 4.9 < c.limit < 5.1
+
+
+def test_throttling_halves_the_limit_once_per_round_trip():
+    c = controller(initial=8, maximum=8)
+    for _ in range(3):
+        assert c.try_acquire()
+        c.release(latency=0.1, status=429)
+
+    assert c.snapshot()["limit"] == 4
+    assert c.snapshot()["throttled"] == 3
+
+
+def test_retry_after_pauses_new_requests():
+    c = controller(initial=4, maximum=8)
+    assert c.try_acquire()
+    c.release(latency=0.1, status=503, retry_after=0.2)
+
+    assert not c.try_acquire()
+    time.sleep(0.25)
+    assert c.try_acquire()
+
+
+def test_slots_are_also_drawn_from_the_global_cap():
+    cap = imerg.InflightCap(1)
+    first, second = controller(global_cap=cap), controller(global_cap=cap)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release(latency=0.1, status=200)
+    assert second.try_acquire()
+
+
+def test_async_waiters_are_handed_freed_slots():
+    c = controller(initial=2, maximum=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        await c.acquire_async()
+        peak = max(peak, c.in_flight)
+        await asyncio.sleep(0.01)
+        c.release(latency=0.01, status=200)
+
+    async def run():
+        await asyncio.wait_for(asyncio.gather(*[request() for _ in range(50)]), 10)
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert c.in_flight == 0
+    assert not c._async_waiters
+
+
+def test_async_waiters_resume_after_a_retry_after_pause():
+    c = controller(initial=2, maximum=2)
+
+    async def run():
+        await c.acquire_async()
+        c.release(latency=0.01, status=503, retry_after=0.2)
+        started = time.monotonic()
+        await asyncio.wait_for(c.acquire_async(), 5)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.15
@@ -0,0 +1,184 @@
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import imerg
+from opendap_standin import synthetic_subset
+
+BBOX = (106.0, -7.0, 108.0, -6.0)
+DATES = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(8)]
+
+
+def subsets_dir(workdir, name="subsets"):
+    path = workdir / name
+    path.mkdir()
+    return str(path)
+
+
+def read_precipitation(path):
+    with xr.open_dataset(path) as ds:
+        return ds["precipitation"].values
+
+
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_engines_return_one_subset_per_date(standin, workdir, engine):
+    server = standin()
+    report = imerg.DownloadReport()
+    results = imerg.download_all_imerg(DATES, subsets_dir(workdir), "token", BBOX, report, engine=engine)
+
+    assert [path.endswith(f"IMERG_Subset_{date:%Y%m%d}.nc4") for date, path in zip(DATES, results)] == [True] * len(DATES)
+    assert report.summary()["succeeded"] == len(DATES)
+    assert server.requests == len(DATES)
+
+
+def test_engines_write_identical_subsets(standin, workdir, monkeypatch):
+    standin()
+    thread_results = imerg.download_all_imerg(DATES, subsets_dir(workdir, "thread"), "token", BBOX, engine="thread")
+    # A fresh cache, so the async engine downloads everything again
+    monkeypatch.setattr(imerg, "_subset_cache", imerg.SubsetCache(str(workdir / "async_cache")))
+    async_results = imerg.download_all_imerg(DATES, subsets_dir(workdir, "async"), "token", BBOX, engine="async")
+
+    for thread_path, async_path in zip(thread_results, async_results):
+        np.testing.assert_array_equal(read_precipitation(thread_path), read_precipitation(async_path))
+
+
+def test_fetch_window_serves_contained_windows_from_cache(standin, workdir):
+    server = standin()
+    cache = imerg.get_subset_cache()
+    window = imerg.bbox_to_window(BBOX)
+    inner = (window[0] + 2, window[1] - 2, window[2] + 1, window[3] - 1)
+
+    entry = imerg.fetch_window(DATES[0], window, "token", cache=cache)
+    assert tuple(entry["window"]) == tuple(window)
+    assert imerg.fetch_window(DATES[0], inner, "token", cache=cache)["path"] == entry["path"]
+    assert server.requests == 1
+
+    assert imerg.download_subset_imerg(DATES[0], subsets_dir(workdir), "token", BBOX, cache=cache) is not None
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_transient_errors_are_retried(standin, workdir, monkeypatch, engine):
+    monkeypatch.setattr(imerg, "HTTP_MAX_RETRIES", 20)
+    random.seed(0)
+    server = standin(fail_rate=0.5, truncate_rate=0.3)
+    report = imerg.DownloadReport()
+    results = imerg.download_all_imerg(DATES, subsets_dir(workdir), "token", BBOX, report, engine=engine)
+
+    assert all(results)
+    assert report.summary()["retries"] > 0
+    assert server.requests > len(DATES)
+
+
+def test_truncated_transfers_resume_with_range_requests(standin, workdir, monkeypatch):
+    monkeypatch.setattr(imerg, "HTTP_MAX_RETRIES", 20)
+    random.seed(1)
+    server = standin(truncate_rate=0.5)
+    results = imerg.download_all_imerg(DATES, subsets_dir(workdir), "token", BBOX, engine="thread")
+
+    assert all(imerg.verify_subset_file(path) for path in results)
+    # Resumed transfers only fetch the missing tail of the body
+    assert server.bytes_sent < 2 * sum(os.path.getsize(path) for path in results)
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(imerg, "HTTP_BACKOFF_BASE", 1.0)
+    monkeypatch.setattr(imerg, "HTTP_BACKOFF_MAX", 8.0)
+    assert all(0 <= imerg.backoff_delay(attempt) <= min(8.0, 2 ** attempt) for attempt in range(10))
+    assert imerg.backoff_delay(3, retry_after=2.5) == 2.5
+    assert imerg.backoff_delay(3, retry_after=120) == 8.0
+    assert imerg.parse_retry_after("7") == 7
+
+
+def test_permanent_errors_fail_after_retries(standin, workdir, monkeypatch):
+    monkeypatch.setattr(imerg, "HTTP_MAX_RETRIES", 2)
+    standin(fail_rate=1.0)
+    report = imerg.DownloadReport()
+    results = imerg.download_all_imerg(DATES[:2], subsets_dir(workdir), "token", BBOX, report, engine="thread")
+
+    assert results == [None, None]
+    assert sorted(report.failed_dates()) == [f"{date:%Y-%m-%d}" for date in DATES[:2]]
+
+
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_cancelled_job_skips_remaining_dates(standin, workdir, engine):
+    standin(latency=0.3)
+    dates = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(60)]
+    job = imerg.DownloadJob(dates, subsets_dir(workdir), "token", BBOX, engine=engine).start()
+    job.cancel()
+    results = job.result(timeout=30)
+
+    assert job.state == "cancelled"
+    assert len(results) == len(dates)
+    assert None in results
+
+
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_concurrent_jobs_share_in_flight_downloads(standin, workdir, engine):
+    # More overlapping dates than the event loop's default executor has threads
+    server = standin(latency=0.2)
+    dates = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(40)]
+    directories = [subsets_dir(workdir, f"job{i}") for i in range(2)]
+    reports = [imerg.DownloadReport(), imerg.DownloadReport()]
+    results = [None, None]
+
+    def run(i):
+        results[i] = imerg.download_all_imerg(dates, directories[i], "token", BBOX, reports[i], engine=engine)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert all(all(paths) for paths in results)
+    assert server.requests == len(dates)
+    summaries = [report.summary() for report in reports]
+    assert sum(summary["shared_fetches"] + summary["cache_hits"] for summary in summaries) == len(dates)
+
+
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_file_and_in_memory_jobs_share_in_flight_downloads(standin, workdir, engine):
+    server = standin(latency=0.2)
+    dates = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(20)]
+    directory = subsets_dir(workdir)
+    arrays = {}
+    results = {}
+
+    def run(in_memory):
+        on_complete = (lambda date, subset: arrays.setdefault(date, subset.values)) if in_memory else None
+        results[in_memory] = imerg.download_all_imerg(dates, directory, "token", BBOX, engine=engine,
+                                                      on_complete=on_complete, in_memory=in_memory)
+
+    threads = [threading.Thread(target=run, args=(in_memory,)) for in_memory in (False, True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert all(results[False]) and all(results[True])
+    assert server.requests == len(dates)
+    for date, path in zip(dates, results[False]):
+        np.testing.assert_array_equal(read_precipitation(path).squeeze(), arrays[date].squeeze())
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+@pytest.mark.parametrize("engine", imerg.DOWNLOAD_ENGINES)
+def test_each_date_gets_its_own_values(standin, workdir, engine, in_memory):
+    standin()
+    window = imerg.bbox_to_window(BBOX)
+    arrays = {}
+    imerg.download_all_imerg(DATES, subsets_dir(workdir), "token", BBOX, engine=engine, in_memory=in_memory,
+                             on_complete=lambda date, subset: arrays.setdefault(date, subset))
+
+    assert sorted(arrays) == DATES
+    for date, subset in arrays.items():
+        expected = imerg.decode_subset(synthetic_subset(*window, with_coords=False, day=date.toordinal()))
+        values = subset.values if in_memory else read_precipitation(subset).squeeze()
+        np.testing.assert_array_equal(values, expected)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import imerg
+
+BBOX = (106.0, -7.0, 108.0, -6.0)
+DATES = [datetime(2024, 1, 1) + timedelta(days=i) for i in range(6)]
+
+
+def read_output(path, output_format):
+    """Returns an output file as a (date, point ID) frame of values."""
+    if output_format in ("long_csv", "parquet"):
+        frame = pd.read_parquet(path) if output_format == "parquet" else pd.read_csv(path)
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.pivot(index="date", columns="id", values="value")
+    frame = pd.read_excel(path, header=None) if output_format == "excel" else pd.read_csv(path, header=None)
+    ids = frame.iloc[0, 1:].astype(int).tolist()
+    rows = frame.iloc[list(frame[0]).index("Date") + 1:]
+    values = rows.iloc[:, 1:].astype(float).set_axis(ids, axis=1)
+    return values.set_axis(pd.to_datetime(rows[0], format="%d-%b-%Y"), axis=0)
+
+
+@pytest.fixture
+def subsets(standin, workdir):
+    standin()
+    directory = workdir / "subsets"
+    directory.mkdir()
+    imerg.download_all_imerg(DATES, str(directory), "token", BBOX, engine="thread")
+    return directory
+
+
+def test_point_index_matches_nearest_cell_lookup():
+    rng = np.random.default_rng(1)
+    lon = -179.95 + 0.1 * np.arange(100, 120)
+    lat = -89.95 + 0.1 * np.arange(50, 62)
+    values = rng.random((len(lon), len(lat)))
+    values[3, 4] = np.nan
+    df_coords = pd.DataFrame({"Lon": rng.uniform(lon[0], lon[-1], 40), "Lat": rng.uniform(lat[0], lat[-1], 40)})
+    df_coords.loc[5, "Lon"] = np.nan
+    df_coords.loc[6, ["Lon", "Lat"]] = lon[3], lat[4]
+
+    gathered = imerg.PointIndex(df_coords).gather(values, lon, lat)
+
+    for i, (x, y) in enumerate(zip(df_coords["Lon"], df_coords["Lat"])):
+        if i == 5:
+            assert gathered[i] == -9999
+        else:
+            expected = values[np.abs(lon - x).argmin(), np.abs(lat - y).argmin()]
+            assert gathered[i] == (-9999 if np.isnan(expected) else expected)
+    assert gathered[6] == -9999
+
+
+@pytest.mark.parametrize("output_format", ["excel", "csv", "long_csv", "parquet"])
+def test_writers_round_trip_the_extracted_values(workdir, output_format):
+    df_coords = pd.DataFrame({"Lon": [106.5, 107.5, 107.0], "Lat": [-6.5, -6.8, -6.2], "ID": [1, 2, 3]})
+    dates = [pd.Timestamp(date) for date in DATES]
+    cube = np.arange(len(dates) * 3, dtype=np.float64).reshape(len(dates), 3) / 4
+    cube[2, 1] = -9999
+    path = imerg.output_path(str(workdir), "out", output_format)
+
+    with imerg.open_output_writer(output_format, df_coords, path) as writer:
+        writer.write(dates[:4], cube[:4])
+        writer.write(dates[4:], cube[4:])
+
+    values = read_output(path, output_format)
+    assert list(values.index) == dates
+    assert list(values.columns) == [1, 2, 3]
+    np.testing.assert_array_equal(values.to_numpy(), cube)
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet"])
+def test_chunked_extraction_matches_in_memory_extraction(subsets, workdir, output_format):
+    rng = np.random.default_rng(2)
+    points = workdir / "points.csv"
+    pd.DataFrame({"Lon": rng.uniform(106, 108, 25), "Lat": rng.uniform(-7, -6, 25)}).to_csv(points, index=False)
+    whole = imerg.output_path(str(workdir), "whole", output_format)
+    chunked = imerg.output_path(str(workdir), "chunked", output_format)
+
+    imerg.extract_precipitation(str(subsets), str(points), whole, output_format)
+    # A budget this small forces one-day windows, blocks of a few points and one-day output batches
+    assert imerg.plan_chunks(25, 21 * 11, 0.0002) == (1, 4)
+    imerg.extract_precipitation(str(subsets), str(points), chunked, output_format, memory_mb=0.0002)
+
+    expected = read_output(whole, output_format)
+    assert len(expected) == len(DATES) and (expected.to_numpy() != -9999).all()
+    pd.testing.assert_frame_equal(read_output(chunked, output_format), expected)
+
+
+def test_batched_extraction_reuses_one_pool(subsets, workdir, monkeypatch):
+    points = workdir / "points.csv"
+    points.write_text("Lon,Lat\n106.5,-6.5\n107.5,-6.8\n")
+    monkeypatch.setattr(imerg, "OUTPUT_BATCH_DAYS", 2)
+
+    imerg.extract_precipitation(str(subsets), str(points), "sequential.csv", "csv")
+    pools = []
+    extraction_pool = imerg.extraction_pool
+
+    def counting_pool(*args):
+        pools.append(args)
+        return extraction_pool(*args)
+
+    monkeypatch.setattr(imerg, "EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(imerg, "extraction_pool", counting_pool)
+    imerg.extract_precipitation(str(subsets), str(points), "pooled.csv", "csv")
+
+    assert pools == [(2, len(DATES))]
+    with open("sequential.csv") as sequential, open("pooled.csv") as pooled:
+        assert pooled.read() == sequential.read()
@@ -0,0 +1,107 @@
+import io
+import os
+import threading
+import time
+import zipfile
+
+import pytest
+
+import imerg
+
+BBOX = [106.0, -7.0, 108.0, -6.0]
+
+
+@pytest.fixture
+def params(workdir):
+    points = workdir / "points.csv"
+    points.write_text("Lon,Lat\n106.5,-6.5\n107.5,-6.8\n")
+    return {
+        "start_date": "2024-01-01", "end_date": "2024-01-06", "bbox": BBOX, "windows": None,
+        "shapefile": None, "csv_file": str(points), "engine": "thread", "in_memory": False, "persist": False,
+        "use_store": False, "zonal_mode": False, "aggregations": [], "rolling_days": imerg.ROLLING_WINDOW_DAYS,
+        "wet_threshold": imerg.WET_DAY_THRESHOLD, "output_format": "csv", "memory_mb": None,
+    }
+
+
+def extractor_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "imerg-extractor"]
+
+
+def test_process_job_writes_outputs(standin, workdir, params):
+    standin()
+    result = imerg.process_job(imerg.JobWorkspace(str(workdir / "job")), params, "token")
+
+    assert result["downloaded"] == 6
+    assert not result["failed_dates"]
+    assert not extractor_threads()
+
+
+def test_failed_job_stops_its_extractor(workdir, params, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("download failed")
+
+    monkeypatch.setattr(imerg, "download_all_imerg", fail)
+    with pytest.raises(RuntimeError):
+        imerg.process_job(imerg.JobWorkspace(str(workdir / "job")), params, "token")
+
+    assert not extractor_threads()
+
+
+def test_store_backed_job_skips_stored_days(standin, workdir, params):
+    server = standin()
+    params.update(use_store=True, aggregations=["monthly_total"])
+    first = imerg.process_job(imerg.JobWorkspace(str(workdir / "first")), params, "token")
+    requests = server.requests
+
+    params["end_date"] = "2024-01-08"
+    second = imerg.process_job(imerg.JobWorkspace(str(workdir / "second")), params, "token")
+
+    assert first["downloaded"] == 6
+    assert second["downloaded"] == 2
+    assert server.requests == requests + 2
+    with open(second["outputs"][0]) as f:
+        rows = f.read().splitlines()[4:]  # After the ID, Lon, Lat and Date header rows
+    assert [row.split(",")[0] for row in rows] == [f"{day:02d}-Jan-2024" for day in range(1, 9)]
+
+
+def test_job_zip_holds_exactly_the_jobs_files(standin, workdir, params):
+    standin()
+    workspace = imerg.JobWorkspace(str(workdir / "job"))
+    result = imerg.process_job(workspace, params, "token")
+
+    data = b"".join(workspace.iter_zip())
+    archive = zipfile.ZipFile(io.BytesIO(data))
+
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == sorted(os.path.basename(path) for path in workspace.files())
+    assert "IMERG_Extracted.csv" in archive.namelist() and len(archive.namelist()) == 1 + result["downloaded"]
+    assert len(data) <= workspace.files_bytes() + 1024 * len(archive.namelist())
+    assert not [name for name in os.listdir(workspace.path) if name.endswith(".zip")]
+
+
+def test_cleanup_keeps_workspaces_of_pending_and_recently_finished_jobs(workdir, params):
+    job_queue = imerg.JobQueue(str(workdir / "jobs.db"))
+    root = workdir / "workspaces"
+    root.mkdir()
+    old = time.time() - 2 * imerg.WORKSPACE_MAX_AGE
+
+    def workspace(name, state=None, finished_at=None):
+        path = imerg.JobWorkspace(str(root / name)).path
+        os.utime(path, (old, old))
+        if state is not None:
+            job_id = job_queue.submit("alice", params, path)
+            if finished_at is not None:
+                job_queue.finish(job_id, state)
+                with job_queue.transaction() as conn:
+                    conn.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (finished_at, job_id))
+        return path
+
+    queued = workspace("queued", "queued")
+    finished_recently = workspace("recent", "done", time.time() - 60)
+    finished_long_ago = workspace("expired", "done", old)
+    orphan = workspace("orphan")
+
+    imerg.JobWorkspace.cleanup(str(root), job_queue=job_queue)
+
+    assert os.path.isdir(queued) and os.path.isdir(finished_recently)
+    assert not os.path.exists(finished_long_ago) and not os.path.exists(orphan)
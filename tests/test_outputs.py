@@ -0,0 +1,21 @@
+import pytest
+
+import imerg
+import imerg_cli
+
+
+def test_output_error_flags_excel_column_overflow():
+    assert imerg.output_error(imerg.EXCEL_MAX_COLUMNS - 1, "excel") is None
+    assert "column limit" in imerg.output_error(imerg.EXCEL_MAX_COLUMNS, "excel")
+    assert imerg.output_error(imerg.EXCEL_MAX_COLUMNS, "parquet") is None
+    assert "aggregates" in imerg.output_error(imerg.EXCEL_MAX_COLUMNS, "parquet", ["monthly_total"])
+
+
+def test_cli_refuses_excel_overflow_before_downloading(workdir, monkeypatch):
+    points = workdir / "points.csv"
+    points.write_text("Lon,Lat\n" + "106.5,-6.5\n" * imerg.EXCEL_MAX_COLUMNS)
+    monkeypatch.setattr(imerg, "process_job", pytest.fail)
+
+    with pytest.raises(SystemExit, match="column limit"):
+        imerg_cli.main(["run", "2024-01-01", "2024-01-02", "--bbox", "106", "-7", "108", "-6",
+                        "--points", str(points), "--out", str(workdir / "job")])
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+import imerg
+
+
+@pytest.fixture(params=sorted(imerg.QUOTA_BACKENDS))
+def quota_manager(request, workdir):
+    manager = imerg.QuotaManager(str(workdir / f"quota.{request.param}"), backend=request.param)
+    manager.create_user("alice", "alice@example.com", "secret", daily_quota=10, monthly_quota=100)
+    return manager
+
+
+def test_update_user_quota_changes_only_given_limits(quota_manager):
+    assert quota_manager.update_user_quota("alice", daily_quota=20) == (True, "Quota updated successfully")
+
+    stats = quota_manager.get_user_stats("alice")
+    assert (stats["daily_quota"], stats["monthly_quota"]) == (20, 100)
+
+
+def test_update_user_quota_without_limits_is_a_no_op(quota_manager):
+    assert quota_manager.update_user_quota("alice") == (True, "Quota updated successfully")
+    assert quota_manager.update_user_quota("bob") == (False, "User not found")
+
+    stats = quota_manager.get_user_stats("alice")
+    assert (stats["daily_quota"], stats["monthly_quota"]) == (10, 100)
+
+
+def test_quota_manager_is_shared_across_threads(workdir, monkeypatch):
+    monkeypatch.setattr(imerg, "_quota_manager", None)
+    monkeypatch.setattr(imerg, "USAGE_COMPACTION_INTERVAL", 0)
+    managers = []
+    threads = [threading.Thread(target=lambda: managers.append(imerg.get_quota_manager())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(manager) for manager in managers}) == 1
+    assert imerg.get_quota_manager() is managers[0]
+
+
+def test_repeated_checks_are_answered_from_the_view(quota_manager, monkeypatch):
+    quota_manager.check_quota("alice", 1)
+    reads = []
+    get_usage = quota_manager.backend.get_usage
+    monkeypatch.setattr(quota_manager.backend, "get_usage", lambda *args: reads.append(args) or get_usage(*args))
+
+    for _ in range(5):
+        assert quota_manager.check_quota("alice", 1) == (True, "Quota available")
+    assert reads == []
+
+    quota_manager.update_usage("alice", 4)
+    assert quota_manager.get_user_stats("alice")["daily_usage"] == 4
+    assert len(reads) == 1
+
+
+def test_view_sees_changes_made_by_another_manager(quota_manager):
+    quota_manager.flush()
+    backend = next(name for name, cls in imerg.QUOTA_BACKENDS.items() if isinstance(quota_manager.backend, cls))
+    other = imerg.QuotaManager(quota_manager.backend.db_file, backend=backend)
+    assert quota_manager.check_quota("alice", 8) == (True, "Quota available")
+
+    other.reserve_quota("alice", 5)
+    other.flush()
+
+    assert quota_manager.check_quota("alice", 8) == (False, "Daily quota exceeded. Remaining: 5 files")
+    assert quota_manager.get_user_stats("alice")["daily_usage"] == 5
+
+
+def test_compaction_keeps_current_quota_answers(quota_manager, monkeypatch):
+    current_periods = imerg.QuotaManager.current_periods
+    for periods, files in [(("2023-01-05", "2023-01"), 3), (("2023-01-06", "2023-01"), 2),
+                           (("2023-11-20", "2023-11"), 4), (current_periods(), 6)]:
+        monkeypatch.setattr(imerg.QuotaManager, "current_periods", staticmethod(lambda periods=periods: periods))
+        quota_manager.update_usage("alice", files)
+    monkeypatch.setattr(imerg.QuotaManager, "current_periods", staticmethod(current_periods))
+    stats = quota_manager.get_user_stats("alice")
+    checks = [quota_manager.check_quota("alice", n) for n in (1, 4, 5)]
+
+    report = quota_manager.compact_usage(retention_days=30, retention_months=1)
+
+    assert report["daily_entries_rolled"] == 3
+    assert report["monthly_entries_rolled"] >= 2
+    assert quota_manager.get_user_stats("alice") == stats
+    assert [quota_manager.check_quota("alice", n) for n in (1, 4, 5)] == checks
+    assert stats["total_downloads"] == 15
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import shapely
+
+import imerg
+
+
+def covered_cells(windows):
+    return {(lon, lat) for lon0, lon1, lat0, lat1 in windows
+            for lon in range(lon0, lon1 + 1) for lat in range(lat0, lat1 + 1)}
+
+
+def test_grid_maps_points_to_the_cell_containing_them():
+    grid = imerg.get_grid()
+    lon_idx, lat_idx = grid.points_to_cells([-179.99, 0.05, 179.99], [-89.99, 0.05, 89.99])
+
+    assert lon_idx.tolist() == [0, 1800, 3599]
+    assert lat_idx.tolist() == [0, 900, 1799]
+    lon, lat = grid.coords((1800, 1801, 900, 900))
+    np.testing.assert_allclose(lon, [0.05, 0.15])
+    np.testing.assert_allclose(lat, [0.05])
+
+
+@pytest.mark.parametrize("lons, lats", [([200.0], [0.0]), ([0.0], [np.nan]), ([0.0, 1.0], [0.0])])
+def test_grid_rejects_invalid_coordinates(lons, lats):
+    with pytest.raises(ValueError):
+        imerg.get_grid().points_to_cells(lons, lats)
+
+
+def test_subset_url_requests_only_the_precipitation_hyperslab():
+    url = imerg.build_subset_url(datetime(2024, 3, 5), (10, 20, 30, 40))
+
+    assert url.endswith("?precipitation[0:0][10:20][30:40]")
+    assert "/2024/03/" in url and "20240305" in url
+    assert "lon[" not in url and "lat[" not in url
+
+
+def test_point_windows_cover_every_point_with_few_cells():
+    lons = [106.51, 106.52, 107.55, 110.0]
+    lats = [-6.51, -6.52, -6.85, -7.0]
+    windows = imerg.point_windows(lons, lats)
+
+    cells = set(zip(*imerg.points_to_cells(lons, lats)))
+    assert cells <= covered_cells(windows)
+    assert sum(imerg.window_cells(window) for window in windows) < imerg.window_cells(
+        imerg.bbox_to_window((min(lons), min(lats), max(lons), max(lats))))
+
+
+def test_merge_windows_trades_wasted_cells_for_requests():
+    apart = [(0, 0, 0, 0), (0, 0, 5, 5)]
+
+    assert len(imerg.merge_windows(apart, merge_cells=0)) == 2
+    assert imerg.merge_windows(apart, merge_cells=10) == [(0, 0, 0, 5)]
+    assert imerg.merge_windows([(0, 4, 0, 4), (2, 6, 2, 6)], merge_cells=0) == [(0, 6, 0, 6)]
+
+
+def test_mask_to_windows_covers_exactly_the_masked_cells():
+    rng = np.random.default_rng(0)
+    mask = rng.random((12, 9)) < 0.4
+    window = (100, 111, 200, 208)
+    windows = imerg.mask_to_windows(mask, window)
+
+    expected = {(100 + i, 200 + j) for i, j in zip(*np.nonzero(mask))}
+    assert covered_cells(windows) == expected
+    assert sum(imerg.window_cells(w) for w in windows) == mask.sum()
+
+
+def test_polygon_windows_cover_an_l_shape_with_less_than_its_bbox():
+    shape = shapely.Polygon([(106, -7), (108, -7), (108, -6.8), (106.2, -6.8), (106.2, -6), (106, -6)])
+    windows = imerg.polygon_windows(shape, merge_cells=0)
+
+    window = imerg.get_grid().cover_window(shape.bounds)
+    mask = imerg.rasterize_geometry(shape, window)
+    inside = {(window[0] + i, window[2] + j) for i, j in zip(*np.nonzero(mask))}
+    assert inside <= covered_cells(windows)
+    assert sum(imerg.window_cells(w) for w in windows) < imerg.window_cells(window) / 2